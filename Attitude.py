@@ -2,23 +2,68 @@
 # Receives attitude data in yaw, pitch, roll; sends attitude back in quaternion format
 
 import time
-import math
+import select
+import socket
+import logging
 import threading
+from math import sin, cos               # module globals: cheaper than math.sin
+                                        # attribute lookups in the quaternion kernel,
+                                        # and supported by numba's njit
 from pymavlink import mavutil
-from terminal_utils import print_info, print_success, print_warning, print_error, print_status
+
+try:
+    from terminal_utils import print_info, print_success, print_warning, print_error, print_status
+except ImportError:                     # standalone use outside the repo: plain prints
+    print_info = print_success = print_warning = print_error = print
+    def print_status(text, status):
+        print(text)
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+logger = logging.getLogger("attitude")
 
 SERIAL_PORT = "/dev/ttyAMA0"
 BAUD_RATE = 115200
 MSG_ID_ATTITUDE = mavutil.mavlink.MAVLINK_MSG_ID_ATTITUDE
 
+
+def _euler_to_quaternion(roll: float, pitch: float, yaw: float) -> tuple:
+    """ Convert roll (x), pitch (y), and yaw (z) into a quaternion
+
+    Module-level scalar kernel so it can be JIT-compiled by numba when
+    available (see below); called once per SET_ATTITUDE_TARGET message.
+    """
+    cr = cos(roll * 0.5)
+    sr = sin(roll * 0.5)
+    cp = cos(pitch * 0.5)
+    sp = sin(pitch * 0.5)
+    cy = cos(yaw * 0.5)
+    sy = sin(yaw * 0.5)
+
+    w = cr * cp * cy + sr * sp * sy
+    x = sr * cp * cy - cr * sp * sy
+    y = cr * sp * cy + sr * cp * sy
+    z = cr * cp * sy - sr * sp * cy
+
+    return (w, x, y, z)                 # quaternion (w, x, y, z) format
+
+if NUMBA_AVAILABLE:                     # compile the kernel once; falls back to
+                                        # plain Python when numba is not installed
+    _euler_to_quaternion = njit(cache = True, fastmath = True)(_euler_to_quaternion)
+
 class Attitude:
     def __init__(self,
                 receiver_ip = '192.168.0.103', 
                 receiver_port = 14550, 
                 sender_ip = '192.168.0.103', 
                 sender_port = 14550, 
-                local_ip = '192.168.0.104', 
-                local_port = 14550):
+                local_ip = '192.168.0.104',
+                local_port = 14550,
+                debug = False):
         """
         :param receiver_ip: IP address where ATTITUDE messages are received (default '192.168.0.103')
         :param receiver_port: port for receiving ATTITUDE messages (default 14550)
@@ -26,7 +71,8 @@ class Attitude:
         :param sender_port: port to which we send SET_ATTITUDE_TARGET messages (default 14550)
         :param local_ip: local IP address from which we send messages (default '192.168.0.104')
         :param local_port: local port from which we send messages (default 14550)
-        """             
+        :param debug: enable per-message prints in the send path (default False)
+        """
                                         # receiving
         self.receiver_address = f'udp:{receiver_ip}:{receiver_port}'
 
@@ -35,8 +81,35 @@ class Attitude:
         self.source_address = (local_ip, local_port)
                                         # initiate sending connection
         self.connection = self.__establish_connection()
+                                        # cache the protocol object and socket: the
+                                        # send/receive paths run per frame and should
+                                        # not re-walk the connection attribute chain
+        self._mav = self.connection.mav
+        self._port = self.connection.port
+
+        self.debug = debug              # per-message prints in the send path
+
+        self.target_system = 1          # Example target system ID
+        self.target_component = 1       # Example target component ID
+        self.type_mask = (1 << 6)       # Bitmask to ignore throttle/thrust
+
+                                        # reusable SET_ATTITUDE_TARGET message; fields are
+                                        # updated in place per send instead of allocating a
+                                        # fresh message object every call
+        self._set_att_msg = mavutil.mavlink.MAVLink_set_attitude_target_message(
+            0,                          # time_boot_ms (set per send)
+            self.target_system,
+            self.target_component,
+            self.type_mask,
+            (1.0, 0.0, 0.0, 0.0),      # q (set per send)
+            0.0, 0.0, 0.0,              # body roll/pitch/yaw rates (set per send)
+            0.0                         # thrust
+        )
 
-        self.start_time = None          # starting time for elapsed time calculation
+        self._start_ns = time.monotonic_ns()
+                                        # monotonic base for time_boot_ms: immune to NTP
+                                        # jumps (time.time() can step backwards) and pure
+                                        # integer arithmetic per send
 
         self.d_msg_time_boot_ms = 0.0   # stores ATTITUDE message information
         self.d_msg_roll = 0.0
@@ -57,6 +130,12 @@ class Attitude:
         # Thread control
         self.receiver_thread = None
         self.running = False
+        self._last_status = 0.0         # last time a receive status line was printed
+        self._stop = threading.Event()  # set via stop_sending to halt transmission
+
+        # Warm the quaternion kernel so the JIT cost (if numba is
+        # installed) is paid once at startup, not on the first message
+        _euler_to_quaternion(0.0, 0.0, 0.0)
 
     def __establish_connection(self):
         """ Establishes connection """
@@ -69,6 +148,20 @@ class Attitude:
 
         # Set stream
         self.set_attitude_rate(connection, 10, True)
+
+        # non-blocking socket so the receiver can drain bursts and
+        # return immediately once the queue is empty
+        connection.port.setblocking(False)
+
+        # enlarge the kernel socket buffers: with attitude streaming at
+        # 100+ Hz next to other MAVLink traffic, the default recv buffer
+        # drops packets whenever the Python thread stalls for a few ms
+        try:
+            connection.port.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 2 * 1024 * 1024)
+            connection.port.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 * 1024 * 1024)
+        except OSError as e:
+            print_warning(f"Could not resize socket buffers: {e}")
+
         return connection
 
     def set_attitude_rate(self, master, hz=10, enable=True):
@@ -94,11 +187,46 @@ class Attitude:
 
 
     def _receiver_loop(self):
-        """ Internal method for the receiver thread loop """
+        """ Internal method for the receiver thread loop
+
+        Reads raw bytes off the socket and batch-parses them with
+        parse_buffer, then dispatches on the numeric message id. This
+        avoids recv_match's per-message name-string filtering, which
+        fully parses and then drops every non-ATTITUDE message.
+        """
         while self.running:
-            # 'blocking = true' means it will wait for a message to arrive
-            msg = self.connection.recv_match(type = 'ATTITUDE', blocking = True)
-            if msg:
+            # wait (with timeout) until bytes are available so the
+            # thread can notice self.running going False
+            readable, _, _ = select.select([self._port], [], [], 0.5)
+            if not readable:
+                continue
+
+            # drain every queued datagram in this wake: UDP attitude
+            # streams arrive in bursts, and one parse pass per burst is
+            # cheaper than one wake per packet
+            messages = []
+            while True:
+                try:
+                    buf = self._port.recv(4096)
+                except (BlockingIOError, InterruptedError):
+                    break
+                if not buf:
+                    break
+                try:
+                    parsed = self._mav.parse_buffer(buf)
+                except mavutil.mavlink.MAVError as e:
+                    # corrupt bytes on a lossy link must not kill the
+                    # receiver thread; the parser resyncs on the next
+                    # frame marker
+                    logger.debug("MAVLink parse error: %s", e)
+                    continue
+                if parsed:
+                    messages.extend(parsed)
+
+            for msg in messages:
+                if msg.get_msgId() != MSG_ID_ATTITUDE:
+                    continue            # drop non-ATTITUDE messages in O(1)
+
                 self.d_msg_time_boot_ms = msg.time_boot_ms
                 self.d_msg_roll = msg.roll
                 self.d_msg_pitch = msg.pitch
@@ -107,14 +235,18 @@ class Attitude:
                 self.d_msg_pitchspeed = msg.pitchspeed
                 self.d_msg_yawspeed = msg.yawspeed
 
-                print_status("Received ATTITUDE message", "info")
-                print_info(f"Time Boot (ms): {self.d_msg_time_boot_ms}")
-                print_info(f"Roll (rad): {self.d_msg_roll}")
-                print_info(f"Pitch (rad): {self.d_msg_pitch}")
-                print_info(f"Yaw (rad): {self.d_msg_yaw}")
-                print_info(f"Roll Speed (rad/s): {self.d_msg_rollspeed}")
-                print_info(f"Pitch Speed (rad/s): {self.d_msg_pitchspeed}")
-                print_info(f"Yaw Speed (rad/s): {self.d_msg_yawspeed}")
+                # lazy %-formatting: nothing is formatted unless DEBUG is on
+                logger.debug("ATTITUDE time_boot_ms=%s roll=%s pitch=%s yaw=%s "
+                             "rollspeed=%s pitchspeed=%s yawspeed=%s",
+                             msg.time_boot_ms, msg.roll, msg.pitch, msg.yaw,
+                             msg.rollspeed, msg.pitchspeed, msg.yawspeed)
+
+                # rate-limited status line (1 Hz) for operator visibility
+                now = time.time()
+                if now - self._last_status > 1.0:
+                    self._last_status = now
+                    print_status(f"Receiving ATTITUDE (roll = {msg.roll:.3f}, "
+                                 f"pitch = {msg.pitch:.3f}, yaw = {msg.yaw:.3f})", "info")
 
     def start_receiving(self):
         """ Starts the receiver thread """
@@ -154,66 +286,63 @@ class Attitude:
         """ Returns the latest attitude """
         return (self.d_roll, self.d_pitch, self.d_yaw)
 
+    def stop_sending(self):
+        """ Tells send_attitude to stop transmitting """
+        self._stop.set()
+        print_warning("Transmission stopped")
+
     def send_attitude(self, roll: float, pitch: float, yaw: float):
         """ Sends ATTITUDE (once calculated) """
-        self.start_time = time.time()
-
-        try:
-            target_system = 1           # Example target system ID
-            target_component = 1        # Example target component ID
-            type_mask = (1 << 6)        # Bitmask to ignore throttle/thrust
+        if self._stop.is_set():         # explicit stop flag instead of catching
+                                        # KeyboardInterrupt in the hot path
+            return
 
-            q = self.__euler_to_quaternion(roll, pitch, yaw)
-            if not q:                   # Default to identity quaternion if conversion fails
+        q = self.__euler_to_quaternion(roll, pitch, yaw)
+        if not q:                       # Default to identity quaternion if conversion fails
                                         # (so no rotation)
-                q = (1.0, 0.0, 0.0, 0.0)
-            body_roll_rate = roll       # Roll rate in rad/s
-            body_pitch_rate = pitch     # Pitch rate in rad/s
-            body_yaw_rate = yaw         # Yaw rate in rad/s
-            thrust = 0.0                # Example thrust (50%)
-
-            time_boot_ms = int((time.time() - self.start_time) * 1000)
+            q = (1.0, 0.0, 0.0, 0.0)
+        body_roll_rate = roll           # Roll rate in rad/s
+        body_pitch_rate = pitch         # Pitch rate in rad/s
+        body_yaw_rate = yaw             # Yaw rate in rad/s
+        thrust = 0.0                    # Example thrust (50%)
+
+        time_boot_ms = (time.monotonic_ns() - self._start_ns) // 1_000_000
+        if self.debug:
             print_info(f"Sending SET_ATTITUDE_TARGET message with time_boot_ms = {time_boot_ms}...")
 
-            self.connection.mav.set_attitude_target_send(
-                time_boot_ms,
-                target_system,
-                target_component,
-                type_mask,
-                q,
-                body_roll_rate,
-                body_pitch_rate,
-                body_yaw_rate,
-                thrust
-            )
-
+                                        # update the cached message in place and send it;
+                                        # mav.send handles sequence numbers and framing
+        msg = self._set_att_msg
+        msg.time_boot_ms = time_boot_ms
+        msg.q = q
+        msg.body_roll_rate = body_roll_rate
+        msg.body_pitch_rate = body_pitch_rate
+        msg.body_yaw_rate = body_yaw_rate
+        msg.thrust = thrust
+        try:
+            self._mav.send(msg)
+        except (BlockingIOError, InterruptedError):
+            # the socket is non-blocking: if the kernel send queue is
+            # full, drop this frame instead of stalling the control
+            # loop -- a stale attitude target is worthless anyway
+            now = time.time()
+            if now - self._last_status > 1.0:
+                self._last_status = now
+                print_warning("Send queue full, dropping SET_ATTITUDE_TARGET frame")
+            return
+
+        if self.debug:
             print_success("Message sent successfully")
 
-        except KeyboardInterrupt:
-            print_warning("Transmission stopped by user")
-
-        
     def __euler_to_quaternion(self, roll: float, pitch: float, yaw: float) -> tuple:
         """ Convert roll (x), pitch (y), and yaw (z) into a quaternion
-        
+
         Example usage:
         q = to_quaternion(roll_in_radians, pitch_in_radians, yaw_in_radians)
         print_info(f"Quaternion: w = {q[0]}, x = {q[1]}, y = {q[2]}, z = {q[3]}")
         where roll_in_radians, pitch_in_radians, and yaw_in_radians are the Euler angles in radians
         """
-        cr = math.cos(roll * 0.5)
-        sr = math.sin(roll * 0.5)
-        cp = math.cos(pitch * 0.5)
-        sp = math.sin(pitch * 0.5)
-        cy = math.cos(yaw * 0.5)
-        sy = math.sin(yaw * 0.5)
-
-        w = cr * cp * cy + sr * sp * sy
-        x = sr * cp * cy - cr * sp * sy
-        y = cr * sp * cy + sr * cp * sy
-        z = cr * cp * sy - sr * sp * cy
-
-        return (w, x, y, z)                 # quaternion (w, x, y, z) format
+        return _euler_to_quaternion(roll, pitch, yaw)
 
 
 if __name__ == "__main__":
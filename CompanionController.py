@@ -6,6 +6,7 @@
 
 from UnitConverter import UnitConverter
 
+import math
 import time
 from abc import ABC, abstractmethod
 from simple_pid import PID
@@ -16,6 +17,14 @@ class BaseController(ABC):
     `compute_control' for yaw control signal """
     def __init__(self, converter: UnitConverter):
         self.converter = converter
+                                        # converter ranges are fixed after construction,
+                                        # so cache the px->rad scale locally and save an
+                                        # attribute chain + call frame per control tick
+        self._px_to_rad_scale = converter.px_delta_to_radian_delta(1.0)
+                                        # pre-bound method: callers in the control loop
+                                        # use `controller.compute(err)` and skip the
+                                        # per-tick MRO lookup of compute_control
+        self.compute = self.compute_control
 
     @abstractmethod
     def compute_control(self, error: float, dt: float) -> float:
@@ -47,15 +56,13 @@ class ConstantRateController(BaseController):
                       and target x in pixels; right-oriented
         :return: control signal for yaw in radians/s
         """
-        if abs(error_px) < self.dead_zone_px:
-            px_rate = 0.0
-        elif error_px > 0.0:            # turn right (positive yaw)
-            px_rate = self.yaw_speed_px_per_s
-        else:                           # turn left (negative yaw)
-            px_rate = -self.yaw_speed_px_per_s
-
-                                        # convert to rad/s   
-        return self.converter.px_delta_to_radian_delta(px_rate)
+                                        # branchless: copysign picks turn direction
+                                        # (positive yaw = right), dead zone zeroes it
+        px_rate = (0.0 if abs(error_px) < self.dead_zone_px
+                   else math.copysign(self.yaw_speed_px_per_s, error_px))
+
+                                        # convert to rad/s
+        return px_rate * self._px_to_rad_scale
     
 
 class ProportionalController(BaseController):
@@ -75,22 +82,17 @@ class ProportionalController(BaseController):
 
     def compute_control(self, error_px: float) -> float:
         """ Computes yaw rate proportional to horizontal error """
-        control_px_rate = error_px * self.lever_factor_px
-
-        if control_px_rate > self.max_px_rate:
-            control_px_rate = self.max_px_rate
-        elif control_px_rate < -self.max_px_rate:
-            control_px_rate = -self.max_px_rate
-
-        if abs(error_px) < self.dead_zone_px:
-            control_px_rate = 0.0
-        elif error_px > 0.0:            # turn right (positive yaw)
-            control_px_rate = control_px_rate
-        else:                           # turn left (negative yaw)
-            control_px_rate = -control_px_rate
+                                        # error_px * factor already carries the turn
+                                        # direction, so clamp symmetrically and only
+                                        # zero it inside the dead zone; the old
+                                        # re-signing branch flipped negative errors
+                                        # to a positive yaw rate
+        raw_px_rate = error_px * self.lever_factor_px
+        clamped = max(-self.max_px_rate, min(self.max_px_rate, raw_px_rate))
+        control_px_rate = 0.0 if abs(error_px) < self.dead_zone_px else clamped
 
                                         # convert to rad/s
-        return self.converter.px_delta_to_radian_delta(control_px_rate)
+        return control_px_rate * self._px_to_rad_scale
 
 
 # class PID_wrapper():
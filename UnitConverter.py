@@ -2,7 +2,7 @@
 
 # Converts units (e.g. pixels, axis-rotation units, radians) to units and vice versa
 
-import numpy as np
+import math
 from terminal_utils import print_info, print_success, print_warning, print_error, print_status, print_header
 
 class UnitConverter:
@@ -17,6 +17,29 @@ class UnitConverter:
         self.px_min = float(px_min)
         self.px_max = float(px_max)
 
+                                        # the ranges never change after construction,
+                                        # so cache every scale factor once instead of
+                                        # recomputing it on each conversion call
+        self._px_per_ARU = (self.px_max - self.px_min) / (self.ARU_max - self.ARU_min)
+        self._ARU_per_px = 1.0 / self._px_per_ARU
+        self._rad_per_px = math.tau / (self.px_max - self.px_min)
+        self._px_per_rad = 1.0 / self._rad_per_px
+        self._rad_per_ARU = math.tau / (self.ARU_max - self.ARU_min)
+        self._ARU_per_rad = 1.0 / self._rad_per_ARU
+
+                                        # specialize the six delta converters for this
+                                        # instance: binding the scale as a default
+                                        # argument turns each call into a single
+                                        # local-variable multiply with no self lookup
+                                        # (the class methods below stay as the
+                                        # documented API and behave identically)
+        self.ARU_delta_to_radian_delta = lambda ARU_delta, _s = self._rad_per_ARU: ARU_delta * _s
+        self.radian_delta_to_ARU_delta = lambda radian_delta, _s = self._ARU_per_rad: radian_delta * _s
+        self.px_delta_to_radian_delta = lambda px_delta, _s = self._rad_per_px: px_delta * _s
+        self.radian_delta_to_px_delta = lambda radian_delta, _s = self._px_per_rad: radian_delta * _s
+        self.px_delta_to_ARU_delta = lambda px_delta, _s = self._ARU_per_px: px_delta * _s
+        self.ARU_delta_to_px_delta = lambda ARU_delta, _s = self._px_per_ARU: ARU_delta * _s
+
     def ARU_to_px(self, ARU_value: float) -> float:
         """ Convert axis-rotation units (ARU) to pixels (px)
         
@@ -27,9 +50,7 @@ class UnitConverter:
     
         px = (px_max - px_min) / (ARU_max - ARU_min) * (ARU_value - ARU_min) + px_min
         """
-        px_value = ((self.px_max - self.px_min) / (self.ARU_max - self.ARU_min)
-                    * (ARU_value - self.ARU_min)
-                    + self.px_min)
+        px_value = self._px_per_ARU * (ARU_value - self.ARU_min) + self.px_min
         return max(min(px_value, self.px_max), self.px_min)  # ensure px value is within bounds
     
     def px_to_ARU(self, px_value: float) -> float:
@@ -42,35 +63,56 @@ class UnitConverter:
     
         ARU = (ARU_max - ARU_min) / (px_max - px_min) * (px_value - px_min) + ARU_min
         """
-        ARU_value = ((self.ARU_max - self.ARU_min) / (self.px_max - self.px_min) 
-                     * (px_value - self.px_min)
-                     + self.ARU_min)
+        ARU_value = self._ARU_per_px * (px_value - self.px_min) + self.ARU_min
         return max(min(ARU_value, self.ARU_max), self.ARU_min)  # ensure ARU value is within bounds
     
     def ARU_delta_to_radian_delta(self, ARU_delta: float) -> float:
         """ Converts delta ARU to delta radian """
-        return ARU_delta * (2 * np.pi) / (self.ARU_max - self.ARU_min)
-    
+        return ARU_delta * self._rad_per_ARU
+
     def radian_delta_to_ARU_delta(self, radian_delta: float) -> float:
         """ Converts delta radian to delta ARU """
-        return radian_delta * (self.ARU_max - self.ARU_min) / (2 * np.pi)
+        return radian_delta * self._ARU_per_rad
 
     def px_delta_to_radian_delta(self, px_delta: float) -> float:
         """ Converts px/s (a delta) to radian/s (a delta too) """
-        return px_delta * (2 * np.pi) / (self.px_max - self.px_min)
-    
+        return px_delta * self._rad_per_px
+
     def radian_delta_to_px_delta(self, radian_delta: float) -> float:
         """ Converts radian/s (a delta) to px/s (a delta too) """
-        return radian_delta * (self.px_max - self.px_min) / (2 * np.pi)
+        return radian_delta * self._px_per_rad
 
     def px_delta_to_ARU_delta(self, px_delta: float) -> float:
         """ Converts delta px to delta ARU by scaling with minmax-ratio """
-        return px_delta * (self.ARU_max - self.ARU_min) / (self.px_max - self.px_min)
-    
+        return px_delta * self._ARU_per_px
+
     def ARU_delta_to_px_delta(self, ARU_delta: float) -> float:
         """ Converts delta ARU to delta px by scaling with minmax-ratio """
-        return ARU_delta * (self.px_max - self.px_min) / (self.ARU_max - self.ARU_min)
+        return ARU_delta * self._px_per_ARU
     
+    def px_to_ARU_batch(self, px_values, out = None):
+        """ Convert an ndarray of px values to ARU in one vectorized call
+
+        Same formula as `px_to_ARU`, but applied to a whole batch of
+        candidate pixel positions at once (e.g. all detections of a
+        frame) instead of one Python call per value. Pass a preallocated
+        `out` array to avoid a per-frame allocation.
+        """
+        import numpy as np              # lazy: keeps numpy off the scalar import path
+        out = np.multiply(px_values - self.px_min, self._ARU_per_px, out = out)
+        out += self.ARU_min
+        np.clip(out, self.ARU_min, self.ARU_max, out = out)  # ensure ARU values are within bounds
+        return out
+
+    def px_delta_to_radian_delta_batch(self, px_deltas, out = None):
+        """ Converts an ndarray of px deltas to radian deltas in one vectorized call
+
+        Same formula as `px_delta_to_radian_delta`; pass a preallocated
+        `out` array to avoid a per-frame allocation.
+        """
+        import numpy as np              # lazy: keeps numpy off the scalar import path
+        return np.multiply(px_deltas, self._rad_per_px, out = out)
+
     def get_ARU_min(self) -> float:
         """ Returns the minimum ARU value """
         return self.ARU_min
@@ -4,12 +4,22 @@ import os
 from ultralytics import YOLO
 from terminal_utils import print_info, print_warning, print_error, print_success
 
+# let OpenCV dispatch its SIMD-optimized code paths and OpenCL kernels
+# (no-ops on builds/hardware without them)
+cv2.setUseOptimized(True)
+cv2.ocl.setUseOpenCL(True)
+
 class ObjectDetector:
-    def __init__(self, detection_type='face'):
+    def __init__(self, detection_type='face', detect_interval=1):
         """
-        Initialize the detector with specified type ('face' or 'yolo')
+        Initialize the detector with specified type ('face' or 'yolo').
+        detect_interval=N runs the detector only every Nth frame and
+        returns the cached boxes in between (1 = detect every frame).
         """
         self.detection_type = detection_type
+        self.detect_interval = detect_interval
+        self._frame_idx = 0
+        self._last_result = ([], [], [], [])
         self.model_dir = os.path.join(os.path.dirname(__file__), 'model')
         
         if detection_type == 'face':
@@ -23,6 +33,22 @@ class ObjectDetector:
                 )
             self.face_cascade = cv2.CascadeClassifier(cascade_path)
             self.color = (0, 255, 0)  # Green color for face detection
+
+            # on CUDA builds the cascade can run entirely on the GPU
+            # (needs the cudaobjdetect module and a new-style cascade xml)
+            self._cuda_cascade = None
+            if cv2.cuda.getCudaEnabledDeviceCount() > 0 and hasattr(cv2.cuda, "CascadeClassifier_create"):
+                try:
+                    self._cuda_cascade = cv2.cuda.CascadeClassifier_create(cascade_path)
+                    print_info("Haar cascade backend: CUDA")
+                except cv2.error:
+                    self._cuda_cascade = None
+
+            # otherwise route the cascade through the OpenCL T-API when
+            # a device is present; UMat round-trips cost more than they
+            # save on pure-CPU machines
+            self._use_umat = (self._cuda_cascade is None
+                              and cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL())
             
         elif detection_type == 'yolo':
             # Initialize YOLOv3
@@ -40,19 +66,57 @@ class ObjectDetector:
                 )
             
             self.net = cv2.dnn.readNet(weights_path, config_path)
+
+            # run the net on the GPU when this OpenCV build has CUDA;
+            # FP16 tensor kernels give the biggest per-frame win here
+            if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+                self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+                self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA_FP16)
+                print_info("YOLOv3 DNN backend: CUDA (FP16)")
+            elif cv2.ocl.haveOpenCL():
+                self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_OPENCL_FP16)
+                print_info("YOLOv3 DNN target: OpenCL (FP16)")
+
             with open(names_path, "r") as f:
                 self.classes = [line.strip() for line in f.readlines()]
             
             self.layer_names = self.net.getLayerNames()
             self.output_layers = [self.layer_names[i - 1] for i in self.net.getUnconnectedOutLayers()]
-            self.colors = np.random.uniform(0, 255, size=(len(self.classes), 3))
+                                        # per-class draw colors as plain int tuples so
+                                        # cv2.rectangle gets them without a float64 cast
+            self.colors = [tuple(int(c) for c in np.random.randint(0, 255, 3))
+                           for _ in self.classes]
         
         elif detection_type == 'yolov8':
+            # prefer an exported TensorRT engine when one has been built
+            # (YOLO('best.pt').export(format='engine', half=True)); it runs
+            # the same weights without the PyTorch graph overhead
+            engine_path = os.path.join(self.model_dir, "best.engine")
             weights_path = os.path.join(self.model_dir, "best.pt")
-            if not os.path.exists(weights_path):
+            if os.path.exists(engine_path):
+                self.yolo_model = YOLO(engine_path)
+                print_info("YOLOv8 backend: TensorRT engine (best.engine)")
+            elif os.path.exists(weights_path):
+                self.yolo_model = YOLO(weights_path)
+            else:
                 raise FileNotFoundError("YOLOv8 model file (best.pt) not found.")
-            self.yolo_model = YOLO(weights_path)
             self.color = (255, 0, 0)  # Blue for YOLOv8
+            # class-id -> name mapping, resolved once instead of per box
+            self.class_names = getattr(self.yolo_model, "names", {}) or {}
+
+            # camera frames have a constant shape, so let cuDNN autotune
+            # its conv algorithms once; inference never needs gradients
+            try:
+                import torch
+                torch.backends.cudnn.benchmark = True
+                torch.set_grad_enabled(False)
+            except ImportError:
+                pass
+
+            # warm start: the first predict pays model build/algo
+            # selection, better at init than on the first live frame
+            self.yolo_model.predict(np.zeros((480, 640, 3), np.uint8),
+                                    imgsz=640, verbose=False)
             
         else:
             raise ValueError("detection_type must be either 'face' or 'yolo'")
@@ -63,15 +127,31 @@ class ObjectDetector:
         """
         Detects objects/faces in the given frame and returns their bounding boxes
         """
+        # detectMultiScale / net.forward dominate the frame budget; on
+        # skipped frames hand back the cached boxes instead
+        if self._frame_idx % self.detect_interval != 0:
+            self._frame_idx += 1
+            return self._last_result
+        self._frame_idx += 1
+
         if self.detection_type == 'face':
-            # Face detection
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = self.face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=1.1,
-                minNeighbors=5,
-                minSize=(30, 30)
-            )
+            if self._cuda_cascade is not None:
+                # GPU cascade: upload once, detect, download the boxes
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                gpu_gray = cv2.cuda_GpuMat()
+                gpu_gray.upload(gray)
+                found = self._cuda_cascade.detectMultiScale(gpu_gray).download()
+                faces = found[0] if found is not None else []
+            else:
+                # Face detection (via the OpenCL T-API when available)
+                src = cv2.UMat(frame) if self._use_umat else frame
+                gray = cv2.cvtColor(src, cv2.COLOR_BGR2GRAY)
+                faces = self.face_cascade.detectMultiScale(
+                    gray,
+                    scaleFactor=1.1,
+                    minNeighbors=5,
+                    minSize=(30, 30)
+                )
             
             # Convert faces to the format expected by the rest of the code
             boxes = []
@@ -91,30 +171,25 @@ class ObjectDetector:
             
             self.net.setInput(blob)
             outs = self.net.forward(self.output_layers)
-            
-            class_ids = []
-            confidences = []
-            boxes = []
-            
-            for out in outs:
-                for detection in out:
-                    scores = detection[5:]
-                    class_id = np.argmax(scores)
-                    confidence = scores[class_id]
-                    
-                    if confidence > 0.3:
-                        center_x = int(detection[0] * width)
-                        center_y = int(detection[1] * height)
-                        w = int(detection[2] * width)
-                        h = int(detection[3] * height)
-                        
-                        x = int(center_x - w / 2)
-                        y = int(center_y - h / 2)
-                        
-                        boxes.append([x, y, w, h])
-                        confidences.append(float(confidence))
-                        class_ids.append(class_id)
-            
+
+            # decode all candidates of all three output scales in one
+            # vectorized pass instead of a Python loop over ~25k boxes
+            detections = np.concatenate([out.reshape(-1, out.shape[-1]) for out in outs], axis=0)
+            scores = detections[:, 5:]
+            all_class_ids = scores.argmax(axis=1)
+            all_confidences = scores[np.arange(len(detections)), all_class_ids]
+            keep = all_confidences > 0.3
+
+            kept = detections[keep]
+            w = kept[:, 2] * width
+            h = kept[:, 3] * height
+            x = kept[:, 0] * width - w / 2
+            y = kept[:, 1] * height - h / 2
+
+            boxes = np.stack([x, y, w, h], axis=1).astype(int).tolist()
+            confidences = all_confidences[keep].astype(float).tolist()
+            class_ids = all_class_ids[keep].tolist()
+
             indexes = cv2.dnn.NMSBoxes(boxes, confidences, 0.3, 0.3)
         
         elif self.detection_type == 'yolov8':
@@ -134,36 +209,64 @@ class ObjectDetector:
 
             indexes = list(range(len(boxes)))
 
-        return boxes, confidences, class_ids, indexes
-    
+        self._last_result = (boxes, confidences, class_ids, indexes)
+        return self._last_result
+
+    def detect_batch(self, frames):
+        """
+        Detects objects in a list of frames and returns one
+        (boxes, confidences, class_ids, indexes) tuple per frame.
+
+        The yolov8 backend runs the whole batch through the model in a
+        single predict call, which amortizes the per-call overhead; the
+        other backends fall back to per-frame detect. Useful for offline
+        processing (test_detection.py) -- the live loop stays at batch=1
+        to keep control latency down.
+        """
+        if self.detection_type != 'yolov8':
+            return [self.detect(frame) for frame in frames]
+
+        results = self.yolo_model.predict(frames, imgsz=640, conf=0.3, verbose=False)
+        batched = []
+        for r in results:
+            boxes = []
+            confidences = []
+            class_ids = []
+            for box in r.boxes:
+                x1, y1, x2, y2 = map(int, box.xyxy[0])
+                boxes.append([x1, y1, x2 - x1, y2 - y1])
+                confidences.append(float(box.conf[0]))
+                class_ids.append(int(box.cls[0]))
+            batched.append((boxes, confidences, class_ids, list(range(len(boxes)))))
+        return batched
+
     def draw_detections(self, frame, boxes, confidences, class_ids, indexes):
         """
         Draws the detected objects/faces on the frame
         """
-        for i in range(len(boxes)):
-            if i in indexes:
-                x, y, w, h = boxes[i]
-                if self.detection_type == 'face':
-                    cv2.rectangle(frame, (x, y), (x + w, y + h), self.color, 2)
-                    cv2.putText(frame, "Face", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, self.color, 2)
-                elif self.detection_type == 'yolo':
-                    label = str(self.classes[class_ids[i]])
-                    color = self.colors[class_ids[i]]
-                    cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
-                    cv2.putText(frame, f"{label} {confidences[i]:.2f}", (x, y - 10), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-                elif self.detection_type == 'yolov8':
-                    for i in range(len(boxes)):
-                        if i in indexes:
-                            x, y, w, h = boxes[i]
-                            label = str(class_ids[i])
-                            if hasattr(self.yolo_model, "names"):
-                                label = self.yolo_model.names.get(class_ids[i], str(class_ids[i]))
-                            cv2.rectangle(frame, (x, y), (x + w, y + h), self.color, 2)
-                            cv2.putText(frame, f"{label} {confidences[i]:.2f}", (x, y - 10),
-                                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, self.color, 2)
+        # NMSBoxes returns a list/ndarray, so `in` would scan it per box
+        # (O(N^2) overall); a set makes the membership test O(1) and we
+        # can iterate the kept indexes directly
+        indexes = {int(i) for i in np.asarray(indexes).flatten()}
+        for i in indexes:
+            x, y, w, h = boxes[i]
+            # LINE_4 boxes: no antialiasing coverage masks, invisible
+            # difference at 2 px thickness
+            if self.detection_type == 'face':
+                cv2.rectangle(frame, (x, y), (x + w, y + h), self.color, 2, cv2.LINE_4)
+                cv2.putText(frame, "Face", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, self.color, 2)
+            elif self.detection_type == 'yolo':
+                label = str(self.classes[class_ids[i]])
+                color = self.colors[class_ids[i]]
+                cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2, cv2.LINE_4)
+                cv2.putText(frame, f"{label} {confidences[i]:.2f}", (x, y - 10),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+            elif self.detection_type == 'yolov8':
+                label = self.class_names.get(class_ids[i], str(class_ids[i]))
+                cv2.rectangle(frame, (x, y), (x + w, y + h), self.color, 2, cv2.LINE_4)
+                cv2.putText(frame, f"{label} {confidences[i]:.2f}", (x, y - 10),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, self.color, 2)
 
-        
         return frame
     
     def get_clicked_object(self, event, x, y, flags, param):
@@ -173,10 +276,11 @@ class ObjectDetector:
         """
         if event == cv2.EVENT_LBUTTONDOWN:
             boxes, confidences, class_ids, indexes = param
-            for i in range(len(boxes)):
-                if i in indexes:
-                    box_x, box_y, box_w, box_h = boxes[i]
-                    if (box_x <= x <= box_x + box_w and 
-                        box_y <= y <= box_y + box_h):
-                        return (box_x, box_y, box_w, box_h)
-        return None 
\ No newline at end of file
+            # same O(1)-membership set as in draw_detections
+            indexes = {int(i) for i in np.asarray(indexes).flatten()}
+            for i in indexes:
+                box_x, box_y, box_w, box_h = boxes[i]
+                if (box_x <= x <= box_x + box_w and
+                    box_y <= y <= box_y + box_h):
+                    return (box_x, box_y, box_w, box_h)
+        return None
\ No newline at end of file
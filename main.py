@@ -1,5 +1,24 @@
+import os
+                                        # keep BLAS pools from oversubscribing the cores
+                                        # OpenCV needs; must be set before numpy loads.
+                                        # Deliberately not OMP_NUM_THREADS: torch sizes
+                                        # its CPU inference pool from it at import, which
+                                        # would single-thread YOLOv8 on CPU-only machines
+os.environ.setdefault('OPENBLAS_NUM_THREADS', '1')
+os.environ.setdefault('MKL_NUM_THREADS', '1')
+
 import cv2
 import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+                                        # cap OpenCV's own pool at half the cores so
+                                        # detection, tracking and capture threads do not
+                                        # fight over every hardware thread
+cv2.setUseOptimized(True)
+cv2.setNumThreads(max(1, (os.cpu_count() or 2) // 2))
+
 from Attitude import Attitude
 from CompanionController import ConstantRateController
 from UnitConverter import UnitConverter
@@ -7,8 +26,8 @@ import traceback
 from detection import ObjectDetector
 from tracking import ObjectTracker
 from terminal_utils import (
-    print_header, print_success, print_warning, print_error, 
-    print_info, print_loading, print_menu, print_status
+    print_header, print_success, print_warning, print_error,
+    print_info, print_menu, print_status, Spinner
 )
 
 try:
@@ -17,21 +36,87 @@ try:
 except ImportError:
     PICAMERA_AVAILABLE = False
 
+_KEY_Q = ord('q')                       # quit key, hoisted out of the frame loops
+
+class FrameGrabber:
+    """
+    Reads frames on a daemon thread so capture latency (15-30 ms on
+    USB webcams) overlaps with detection/tracking instead of adding to
+    it. Only the newest frame is kept: the queue holds one entry and
+    stale frames are dropped on the producer side.
+    """
+    def __init__(self, read_fn):
+        """
+        Args:
+            read_fn: callable returning (ok, frame) like cv2.VideoCapture.read
+        """
+        self._read = read_fn
+        self._queue = queue.Queue(maxsize=1)
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """ Starts the grabber thread """
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while self._running:
+            item = self._read()
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:          # consumer is behind: drop the stale frame
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    self._queue.put_nowait(item)
+                except queue.Full:
+                    pass
+
+    def read(self, timeout=1.0):
+        """ Returns (ok, frame); ok is False if no frame arrived in time """
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return False, None
+
+    def stop(self):
+        """ Stops the grabber thread """
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2.0)
+
+
 class ObjectTrackingSystem:
-    def __init__(self, detection_type='face', camera_source='system'):
+    def __init__(self, detection_type='face', camera_source='system', detect_interval=3):
         """
         Initialize the tracking system with specified detection type and camera source
         Args:
             detection_type: 'face' or 'yolo'
             camera_source: 'system' or 'picamera'
+            detect_interval: run the detector every Nth frame in detection
+                             mode, showing cached boxes in between (the
+                             scene barely moves within 33 ms frames)
         """
         try:
             print_header("Object Tracking System")
-            print_loading(f"Initializing {detection_type} detection system...", 1.5)
-            self.detector = ObjectDetector(detection_type)
+                                        # detector load (model read + warmup) and camera
+                                        # bring-up (auto-exposure settling) are
+                                        # independent, so overlap them: the model loads
+                                        # on a worker thread while the camera opens below
+            executor = ThreadPoolExecutor(max_workers=1)
+            detector_future = executor.submit(ObjectDetector, detection_type, detect_interval)
             self.tracker = None
             self.tracking = False
             self.selected_bbox = None
+                                        # latest frame/detections for the mouse callback;
+                                        # the callback is registered once per window, not
+                                        # re-bound every frame
+            self._latest_frame = None
+            self._latest_detections = ([], [], [], [])
             self.attitude = Attitude()
             self.controller = ConstantRateController(UnitConverter())
             
@@ -61,15 +146,41 @@ class ObjectTrackingSystem:
                     print_error("Failed to open camera. Please check camera permissions.")
                     print_info("On macOS, please ensure camera access is granted in System Preferences > Security & Privacy > Privacy > Camera")
                     raise Exception("Could not open video capture device")
-                
+
+                # MJPG halves USB bandwidth vs the default YUYV, a
+                # 1-frame buffer avoids reading stale frames, and
+                # capturing at the model's input size skips a resize
+                # (drivers ignore properties they don't support)
+                self.video.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+                self.video.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                self.video.set(cv2.CAP_PROP_FPS, 30)
+                self.video.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+                self.video.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+
                 # Initialize height and width of video
                 ret, frame = self.video.read()
                 if not ret:
                     print_error("Camera opened but failed to read frame. Please check camera permissions.")
                     raise Exception("Could not read frame from camera")
                 self.height, self.width = frame.shape[:2]
-            
+
             print_success("Camera initialized successfully")
+
+                                        # the spinner runs for however long the model
+                                        # load still needs, instead of a fixed sleep
+            with Spinner(f"Initializing {detection_type} detection system..."):
+                self.detector = detector_future.result()
+            executor.shutdown()
+
+            # capture runs on its own thread from here on
+            if self.video:
+                read_fn = self.video.read
+            else:
+                def read_fn():
+                    frame = self.camera.capture_array()
+                    return frame is not None, frame
+            self.grabber = FrameGrabber(read_fn)
+            self.grabber.start()
             
         except Exception as e:
             print_error(f"Error during initialization: {str(e)}")
@@ -89,9 +200,10 @@ class ObjectTrackingSystem:
             else:
                 # If we're not tracking, try to start tracking
                 print_info("Starting tracking")
-                bbox = self.detector.get_clicked_object(event, x, y, flags, param)
-                if bbox is not None:
-                    self.start_tracking(bbox)
+                bbox = self.detector.get_clicked_object(event, x, y, flags,
+                                                        self._latest_detections)
+                if bbox is not None and self._latest_frame is not None:
+                    self.start_tracking(bbox, self._latest_frame)
 
     def run(self):
         """
@@ -101,17 +213,14 @@ class ObjectTrackingSystem:
             # Start attitude receiver thread
             self.attitude.start_receiving()
             
-            # Create window at startup
+            # Create window at startup and register the click handler once
             cv2.namedWindow('Detection', cv2.WINDOW_NORMAL)
+            cv2.setMouseCallback('Detection', self.mouse_callback)
             print_info("Press 'q' to quit the application")
             
             while True:
-                if self.video:  # System camera
-                    ok, frame = self.video.read()
-                else:  # PiCamera
-                    frame = self.camera.capture_array()
-                    ok = frame is not None
-                
+                ok, frame = self.grabber.read()
+
                 if not ok:
                     print_error("Failed to read frame from camera")
                     break
@@ -119,17 +228,20 @@ class ObjectTrackingSystem:
                 if not self.tracking:
                     # Detection mode
                     boxes, confidences, class_ids, indexes = self.detector.detect(frame)
+
+                    # publish state for the (already registered) callback;
+                    # copy the frame because draw_detections annotates the
+                    # buffer in place and the tracker must be initialized
+                    # on clean pixels
+                    self._latest_frame = frame.copy()
+                    self._latest_detections = (boxes, confidences, class_ids, indexes)
+
                     frame = self.detector.draw_detections(frame, boxes, confidences, class_ids, indexes)
-                    
-                    # Set up mouse callback for object selection
-                    cv2.setMouseCallback('Detection', self.mouse_callback, 
-                                      (boxes, confidences, class_ids, indexes))
-                    
                     cv2.imshow('Detection', frame)
                     
                     # Wait for key press
                     key = cv2.waitKey(1) & 0xFF
-                    if key == ord('q'):
+                    if key == _KEY_Q:
                         break
                         
                 else:
@@ -147,16 +259,12 @@ class ObjectTrackingSystem:
                     # Calculate x_error and x_yaw_rate
                     x_error = center_box[0] - (self.width / 2)
                     # use x_error to calculate new x_yaw_rate 
-                    x_yaw_rate = self.controller.compute_control(x_error)
+                    x_yaw_rate = self.controller.compute(x_error)
                     self.attitude.send_attitude(roll = roll, pitch = pitch, yaw = x_yaw_rate)
 
-                    # Set up mouse callback for object selection
-                    cv2.setMouseCallback('Tracking', self.mouse_callback, 
-                                      (success, bbox, fps))
-                    
                     cv2.imshow('Tracking', frame)
                     
-                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                    if cv2.waitKey(1) & 0xFF == _KEY_Q:
                         break
         except Exception as e:
             print_error(f"Error during tracking: {str(e)}")
@@ -169,7 +277,11 @@ class ObjectTrackingSystem:
     def cleanup(self):
         """ Clean up resources and stop threads """
         print_info("Cleaning up resources...")
-        
+
+        # Stop the frame grabber before releasing its capture device
+        if getattr(self, 'grabber', None):
+            self.grabber.stop()
+
         # Stop attitude threads
         self.attitude.stop_receiving()
         
@@ -184,21 +296,25 @@ class ObjectTrackingSystem:
         
         print_success("Cleanup completed")
     
-    def start_tracking(self, bbox):
+    def start_tracking(self, bbox, frame):
         """
-        Initialize tracking for the selected bounding box
+        Initialize tracking for the selected bounding box using the frame
+        the user actually clicked on (re-capturing here would drop a
+        frame and hand the tracker a stale reference image)
         """
-        self.tracker = ObjectTracker()
-        if self.video:
-            self.tracker.init(self.video.read()[1], bbox)
-        else:
-            self.tracker.init(self.camera.capture_array(), bbox)
+                                        # reuse the wrapper (and its preallocated draw
+                                        # buffers) across tracking sessions; only the
+                                        # native tracker object is recreated per target
+        if self.tracker is None:
+            self.tracker = ObjectTracker()
+        self.tracker.reinit(frame, bbox)
         self.tracking = True
         self.selected_bbox = bbox
         # Create tracking window and destroy detection window
         print_info("Switching to tracking mode...")
         cv2.destroyWindow('Detection')
         cv2.namedWindow('Tracking')
+        cv2.setMouseCallback('Tracking', self.mouse_callback)
         print_success("Tracking started")
 
     def stop_tracking(self):
@@ -210,6 +326,7 @@ class ObjectTrackingSystem:
         print_info("Switching back to detection mode...")
         cv2.destroyWindow('Tracking')
         cv2.namedWindow('Detection')
+        cv2.setMouseCallback('Detection', self.mouse_callback)
         print_success("Tracking stopped")
         
 
@@ -1,5 +1,7 @@
 import os
+import sys
 import time
+import threading
 from typing import Optional
 
 # ANSI color codes
@@ -14,6 +16,16 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+# precomputed prefix/suffix per level: each printer is one string
+# concatenation and a single write() instead of f-string assembly; the
+# color codes are dropped entirely when stdout is not a terminal
+_COLOR = sys.stdout.isatty()
+_ENDC_NL = Colors.ENDC + "\n" if _COLOR else "\n"
+_SUCCESS_PRE = Colors.GREEN + "✓ " if _COLOR else "✓ "
+_WARNING_PRE = Colors.WARNING + "⚠ " if _COLOR else "⚠ "
+_ERROR_PRE = Colors.FAIL + "✗ " if _COLOR else "✗ "
+_INFO_PRE = Colors.BLUE + "ℹ " if _COLOR else "ℹ "
+
 def clear_screen():
     """Clear the terminal screen."""
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -27,19 +39,19 @@ def print_header(text: str):
 
 def print_success(text: str):
     """Print a success message in green."""
-    print(f"{Colors.GREEN}✓ {text}{Colors.ENDC}")
+    sys.stdout.write(_SUCCESS_PRE + text + _ENDC_NL)
 
 def print_warning(text: str):
     """Print a warning message in yellow."""
-    print(f"{Colors.WARNING}⚠ {text}{Colors.ENDC}")
+    sys.stdout.write(_WARNING_PRE + text + _ENDC_NL)
 
 def print_error(text: str):
     """Print an error message in red."""
-    print(f"{Colors.FAIL}✗ {text}{Colors.ENDC}")
+    sys.stdout.write(_ERROR_PRE + text + _ENDC_NL)
 
 def print_info(text: str):
     """Print an info message in blue."""
-    print(f"{Colors.BLUE}ℹ {text}{Colors.ENDC}")
+    sys.stdout.write(_INFO_PRE + text + _ENDC_NL)
 
 def print_loading(text: str, duration: float = 1.0):
     """Print a loading animation."""
@@ -54,6 +66,40 @@ def print_loading(text: str, duration: float = 1.0):
     
     print(f"\r{Colors.GREEN}✓ {text}{Colors.ENDC}")
 
+class Spinner:
+    """Loading animation that spins on a background thread while the
+    with-block does the real work, instead of sleeping for a fixed
+    duration like print_loading."""
+
+    _frames = ['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏']
+
+    def __init__(self, text: str):
+        self.text = text
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._spin, daemon=True)
+        self._thread.start()
+        return self
+
+    def _spin(self):
+        frame_idx = 0
+        while not self._stop.is_set():
+            print(f"\r{Colors.CYAN}{self._frames[frame_idx]} {self.text}{Colors.ENDC}", end='', flush=True)
+            frame_idx = (frame_idx + 1) % len(self._frames)
+            self._stop.wait(0.1)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        if exc_type is None:
+            print(f"\r{Colors.GREEN}✓ {self.text}{Colors.ENDC}")
+        else:
+            print(f"\r{Colors.FAIL}✗ {self.text}{Colors.ENDC}")
+        return False
+
 def print_menu(options: list[str], title: Optional[str] = None):
     """Print a numbered menu with options."""
     if title:
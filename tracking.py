@@ -1,8 +1,36 @@
 import cv2
 # from picamera2 import Picamera2
+import os
 import time
+import types
+import numpy as np
+from collections import namedtuple
 from terminal_utils import print_info, print_warning, print_error
 
+# per-frame debug prints are opt-in: a synchronous stdout write per
+# frame caps the loop rate on its own
+_DEBUG = bool(int(os.environ.get('DRONE_DEBUG', '0')))
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _bbox_geom(x, y, w, h):
+    """ bbox -> (p1x, p1y, p2x, p2y, center_x, center_y) as ints;
+    kept free of cv2 calls so numba can compile it when installed """
+    return (int(x), int(y), int(x + w), int(y + h),
+            int(x) + int(w / 2), int(y) + int(h / 2))
+
+if NUMBA_AVAILABLE:                     # compile once; plain Python otherwise
+                                        # (nogil: the kernel never touches objects,
+                                        # so the drawing thread need not hold the GIL)
+    _bbox_geom = njit(cache = True, nogil = True)(_bbox_geom)
+
+_bbox_geom(0, 0, 0, 0)                  # prime the (possibly cached) compile at import
+
 #setup and initialize Picamer2
 # picam2 = Picamera2()
 # picam2.configure(picam2.create_preview_configuration(raw={"size":(1640,1232)},main={"format":'RGB888',"size": (640,480)}))
@@ -27,85 +55,154 @@ from terminal_utils import print_info, print_warning, print_error
 # if tracker_type == "CSRT": # cpu ~35%, track after reappear: yes, detect lost target: no
 #     tracker = cv2.TrackerCSRT_create()
 
-# used to record the time when we processed last frame 
+# used to record the time when we processed last frame
 prev_frame_time = 0
 new_frame_time = 0
 
+# formatted one-decimal FPS strings for 0.0-120.0; indexing the table
+# replaces a per-value string allocation in the overlay path
+_FPS_LUT = [f"{i / 10:.1f}" for i in range(1201)]
+
 # font which we will be using to display FPS 
 font = cv2.FONT_HERSHEY_SIMPLEX
 
+# Available tracker types with their characteristics. One immutable
+# spec per type, shared by every instance; the factory name is resolved
+# lazily in create_tracker so constructing an ObjectTracker touches
+# exactly one cv2 attribute (and builds without the legacy contrib
+# trackers still work as long as a non-legacy type is chosen).
+_TrackerSpec = namedtuple('_TrackerSpec', 'module factory track_after_reappear detect_lost')
+
+_TRACKER_ZOO = types.MappingProxyType({
+    'BOOSTING':   _TrackerSpec('legacy', 'TrackerBoosting_create', True, False),        # cpu ~15%
+    'MIL':        _TrackerSpec('cv2', 'TrackerMIL_create', True, False),                # cpu ~90%
+    'KCF':        _TrackerSpec('cv2', 'TrackerKCF_create', 'sometimes', True),          # cpu ~5%
+    'TLD':        _TrackerSpec('legacy', 'TrackerTLD_create', True, True),              # cpu ~60-75%
+    'MEDIANFLOW': _TrackerSpec('legacy', 'TrackerMedianFlow_create', True, False),      # cpu ~15-20%
+    'GOTURN':     _TrackerSpec('cv2', 'TrackerGOTURN_create', False, False),
+    'MOSSE':      _TrackerSpec('legacy', 'TrackerMOSSE_create', True, False),           # cpu ~1-2.5%
+    'CSRT':       _TrackerSpec('cv2', 'TrackerCSRT_create', False, False)               # cpu ~35%
+})
+
 class ObjectTracker:
-    def __init__(self, tracker_type='CSRT'):
-        # Define available tracker types with their characteristics
-        self.tracker_zoo = {
-            'BOOSTING': {  # cpu ~15%
-                'create': cv2.legacy.TrackerBoosting_create,
-                'track_after_reappear': True,
-                'detect_lost': False
-            },
-            'MIL': {  # cpu ~90%
-                'create': cv2.TrackerMIL_create,
-                'track_after_reappear': True,
-                'detect_lost': False
-            },
-            'KCF': {  # cpu ~5%
-                'create': cv2.TrackerKCF_create,
-                'track_after_reappear': 'sometimes',
-                'detect_lost': True
-            },
-            'TLD': {  # cpu ~60-75%
-                'create': cv2.legacy.TrackerTLD_create,
-                'track_after_reappear': True,
-                'detect_lost': True
-            },
-            'MEDIANFLOW': {  # cpu ~15-20%
-                'create': cv2.legacy.TrackerMedianFlow_create,
-                'track_after_reappear': True,
-                'detect_lost': False
-            },
-            'GOTURN': {
-                'create': cv2.TrackerGOTURN_create,
-                'track_after_reappear': False,
-                'detect_lost': False
-            },
-            'MOSSE': {  # cpu ~1-2.5%
-                'create': cv2.legacy.TrackerMOSSE_create,
-                'track_after_reappear': True,
-                'detect_lost': False
-            },
-            'CSRT': {  # cpu ~35%
-                'create': cv2.TrackerCSRT_create,
-                'track_after_reappear': False,
-                'detect_lost': False
-            }
-        }
-        
+                                        # draw constants, bound once at class scope
+                                        # instead of rebuilt/looked up per frame
+    _RED = (0, 0, 255)                  # tracking box and failure text
+    _GREEN = (100, 255, 0)              # FPS overlay
+    _LINE_4 = cv2.LINE_4
+
+    def __init__(self, tracker_type='CSRT', speed_priority=False, downscale=2,
+                 template_size=None, use_segmentation=None, num_hog_channels_used=None):
+        # speed_priority trades CSRT's accuracy for MOSSE's ~1-2.5% CPU
+        # (vs ~35%, per the zoo notes); both reacquire after reappear
+        if speed_priority and tracker_type == 'CSRT':
+            tracker_type = 'MOSSE'
+
         # Initialize tracker type
-        if tracker_type not in self.tracker_zoo:
+        if tracker_type not in _TRACKER_ZOO:
             raise ValueError(f"Unknown tracker type: {tracker_type}")
         self.tracker_type = tracker_type
         print_info(f"Tracker selected: {tracker_type}")
-        
+
+        # optional CSRT tuning: shrinking template_size (default 200)
+        # and disabling segmentation are the documented levers for
+        # keeping CSRT's working set small on Pi-class hardware
+        self._csrt_template_size = template_size
+        self._csrt_use_segmentation = use_segmentation
+        self._csrt_num_hog_channels = num_hog_channels_used
+
         # Initialize tracker
         self.tracker = self.create_tracker(tracker_type)
+
+        # CSRT cost scales with template/search area, so running the
+        # tracker on a pyrDown'd frame (downscale=2) is the single
+        # biggest speedup; bboxes are mapped between scales at the
+        # boundary. downscale=1 tracks at full resolution.
+        if downscale not in (1, 2):
+            raise ValueError(f"downscale must be 1 or 2, got: {downscale}")
+        self.downscale = downscale
+
+        # grayscale trackers convert internally anyway; feeding them a
+        # 1-channel buffer cuts their input traffic 3x. CSRT keeps BGR
+        # (it uses color features), and so does KCF: its default params
+        # use Color Names features, which assert a 3-channel input.
+        # The destination buffer is reused.
+        self._use_gray = tracker_type in ('MOSSE', 'MEDIANFLOW')
+        self._gray = None
         
-        # Performance metrics
-        self.prev_frame_time = 0
-        self.new_frame_time = 0
+        # Performance metrics: exponential moving average of the frame
+        # interval in integer nanoseconds -- instantaneous 1/dt jitters
+        # wildly, and the monotonic integer clock cannot step backwards
+        self._ema_ns = 0
+        self._prev_ns = time.perf_counter_ns()
         self.font = cv2.FONT_HERSHEY_SIMPLEX
+
+        # cached FPS overlay: Hershey glyph rasterization is not cheap
+        # at scale 2 / thickness 3, and the smoothed value repeats
+        # across frames, so the text is rendered into a sprite once per
+        # distinct value and blitted afterwards
+        self._fps_value = None
+        self._fps_text = _FPS_LUT[0]
+        self._fps_sprite = None
+        self._fps_mask = None
+
+        # preallocated polyline points: tracking box plus a cross at the
+        # center, drawn with a single cv2.polylines call per frame
+        # instead of separate rectangle and circle calls
+        self._draw_pts = np.empty((2, 5, 2), dtype = np.int32)
+        self._poly_list = [self._draw_pts[0], self._draw_pts[1]]
         
     def create_tracker(self, tracker_type):
         """
         Creates and returns a tracker instance based on the specified type
         """
-        return self.tracker_zoo[tracker_type]['create']()
+        if tracker_type == 'CSRT' and any(v is not None for v in (
+                self._csrt_template_size, self._csrt_use_segmentation,
+                self._csrt_num_hog_channels)):
+            params = cv2.TrackerCSRT_Params()
+            if self._csrt_template_size is not None:
+                params.template_size = self._csrt_template_size
+            if self._csrt_use_segmentation is not None:
+                params.use_segmentation = self._csrt_use_segmentation
+            if self._csrt_num_hog_channels is not None:
+                params.num_hog_channels_used = self._csrt_num_hog_channels
+            return cv2.TrackerCSRT_create(params)
+
+        spec = _TRACKER_ZOO[tracker_type]
+        module = cv2.legacy if spec.module == 'legacy' else cv2
+        return getattr(module, spec.factory)()
     
+    def reinit(self, frame, bbox):
+        """
+        Re-target the tracker on a new bounding box, reusing this
+        wrapper and its preallocated buffers (FPS sprite, draw points).
+        cv2 trackers expose no reset API, so only the small native
+        tracker object itself is recreated.
+        """
+        self.tracker = self.create_tracker(self.tracker_type)
+        self.init(frame, bbox)
+
+    def _prepare(self, frame):
+        """ Applies the input reductions (grayscale, downscale) the
+        tracker is configured for """
+        if self._use_gray:
+            if self._gray is None or self._gray.shape != frame.shape[:2]:
+                self._gray = np.empty(frame.shape[:2], dtype = np.uint8)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst = self._gray)
+            frame = self._gray
+        if self.downscale == 2:
+            frame = cv2.pyrDown(frame)
+        return frame
+
     def init(self, frame, bbox):
         """
         Initialize the tracker with a frame and bounding box
         """
-        self.tracker.init(frame, bbox)
-        self.prev_frame_time = time.time()
+        if self.downscale == 2:
+                                        # the new-API trackers only accept an int rect
+            bbox = tuple(int(v / 2) for v in bbox)
+        self.tracker.init(self._prepare(frame), bbox)
+        self._prev_ns = time.perf_counter_ns()
     
     def update(self, frame):
         """
@@ -115,14 +212,21 @@ class ObjectTracker:
             bbox: tuple, the bounding box coordinates (x, y, w, h)
             fps: float, current frames per second
         """
-        success, bbox = self.tracker.update(frame)
-        
-        # Calculate FPS
-        self.new_frame_time = time.time()
-        fps = 1/(self.new_frame_time - self.prev_frame_time)
-        self.prev_frame_time = self.new_frame_time
-        fps = round(fps, 1)
-        
+        success, bbox = self.tracker.update(self._prepare(frame))
+        if self.downscale == 2:
+            bbox = tuple(v * 2 for v in bbox)
+
+        # Smooth the frame interval with a pure-integer EMA (alpha = 1/8)
+        # so one slow frame doesn't spike the display; the only float op
+        # left is the single division into a displayable FPS
+        now = time.perf_counter_ns()
+        dt = now - self._prev_ns
+        self._prev_ns = now
+        self._ema_ns = dt if self._ema_ns == 0 else (self._ema_ns * 7 + dt) // 8
+                                        # one-decimal value via integer tenths,
+                                        # skipping round()'s banker's-rounding path
+        fps = int(1e10 / self._ema_ns + 0.5) / 10.0 if self._ema_ns > 0 else 0.0
+
         return success, bbox, fps
     
     def calculate_coordinates(self, success, bbox): 
@@ -131,11 +235,10 @@ class ObjectTracker:
         """
         if success:
             # Calculate rectangle coordinates
-            p1 = (int(bbox[0]), int(bbox[1]))
-            p2 = (int(bbox[0] + bbox[2]), int(bbox[1] + bbox[3]))
-            center_bbox = [int(bbox[0])+int(bbox[2]/2), int(bbox[1])+int(bbox[3]/2)] 
-            
-            return p1, p2, center_bbox
+            p1x, p1y, p2x, p2y, center_x, center_y = _bbox_geom(
+                bbox[0], bbox[1], bbox[2], bbox[3])
+
+            return (p1x, p1y), (p2x, p2y), [center_x, center_y]
         else:
             return None, None, None
         
@@ -143,15 +246,93 @@ class ObjectTracker:
         """
         Draw the tracking box and FPS on the frame
         """
+                                        # local aliases shortcut the cv2 LOAD_ATTR
+                                        # walk on every frame
+        polylines, put_text = cv2.polylines, cv2.putText
+
         if p1 is not None and p2 is not None and center_box is not None:
-            cv2.rectangle(frame, p1, p2, (0,0,255), 2, 2)
-            cv2.circle(frame, (center_box[0], center_box[1]), 3, (0,0,255), 2)
+            # one fused polylines call rasterizes the box and the center
+            # cross together; LINE_4 skips the antialiasing coverage
+            # masks, invisible at 2 px thickness
+            (x1, y1), (x2, y2) = p1, p2
+            cx, cy = center_box
+            rect, cross = self._poly_list
+            rect[0] = x1, y1
+            rect[1] = x2, y1
+            rect[2] = x2, y2
+            rect[3] = x1, y2
+            rect[4] = x1, y1
+            cross[0] = cx - 3, cy
+            cross[1] = cx + 3, cy
+            cross[2] = cx, cy
+            cross[3] = cx, cy - 3
+            cross[4] = cx, cy + 3
+            polylines(frame, self._poly_list, False, self._RED, 2, self._LINE_4)
         else:
-            cv2.putText(frame, "Tracking failed!", (100, 80), self.font, 
-                       0.75, (0, 0, 255), 2)
-            print_warning("Tracking lost target!")
-        
-        # Draw FPS
-        cv2.putText(frame, str(fps), (7, 70), self.font, 2, (100, 255, 0), 3, cv2.LINE_AA)
+            put_text(frame, "Tracking failed!", (100, 80), self.font,
+                       0.75, self._RED, 2)
+            if _DEBUG:                  # fires every frame while the target is
+                                        # lost; the on-frame text already says it
+                print_warning("Tracking lost target!")
         
+        # Draw FPS from the cached sprite (re-rendered only when the
+        # displayed value actually changes)
+        if fps != self._fps_value:
+                                        # integer tenths index the precomputed string
+                                        # table; values past 120 fps fall back to the
+                                        # direct formatter
+            fps_tenths = int(fps * 10 + 0.5)
+            text = (_FPS_LUT[fps_tenths] if 0 <= fps_tenths < len(_FPS_LUT)
+                    else f"{fps_tenths // 10}.{fps_tenths % 10}")
+            self._fps_text = text
+            (text_w, text_h), baseline = cv2.getTextSize(text, self.font, 2, 3)
+            sprite = np.zeros((text_h + baseline, text_w, 3), dtype = np.uint8)
+            cv2.putText(sprite, text, (0, text_h), self.font, 2, self._GREEN, 3, cv2.LINE_AA)
+            self._fps_value = fps
+            self._fps_sprite = sprite
+            self._fps_mask = sprite.any(axis = 2)
+            self._fps_top = 70 - text_h # same baseline as the old putText at (7, 70)
+
+        sprite = self._fps_sprite
+        roi = frame[self._fps_top : self._fps_top + sprite.shape[0], 7 : 7 + sprite.shape[1]]
+        if roi.shape[:2] == sprite.shape[:2]:
+            roi[self._fps_mask] = sprite[self._fps_mask]
+        else:                           # sprite does not fit (tiny frame): draw directly
+            cv2.putText(frame, self._fps_text, (7, 70), self.font, 2, self._GREEN, 3, cv2.LINE_AA)
+
         return frame
+
+
+class MultiObjectTracker:
+    """
+    Tracks several targets with one native update call per frame via
+    cv2.legacy.MultiTracker: one Python-to-C crossing advances all N
+    trackers instead of N separate update calls.
+    """
+    def __init__(self):
+        self.multi = cv2.legacy.MultiTracker_create()
+
+    def add(self, frame, bbox, tracker_type='CSRT'):
+        """
+        Adds a target (bounding box) to track, using the given tracker
+        type from the zoo
+        """
+        if tracker_type not in _TRACKER_ZOO:
+            raise ValueError(f"Unknown tracker type: {tracker_type}")
+        spec = _TRACKER_ZOO[tracker_type]
+        # MultiTracker only accepts legacy-API trackers; all zoo entries
+        # except GOTURN have a cv2.legacy counterpart under the same
+        # factory name
+        factory = getattr(cv2.legacy, spec.factory, None)
+        if factory is None:
+            raise ValueError(f"{tracker_type} has no legacy-API implementation for MultiTracker")
+        self.multi.add(factory(), frame, bbox)
+
+    def update(self, frame):
+        """
+        Update all trackers with a new frame
+        Returns:
+            success: bool, whether every tracker succeeded
+            boxes: ndarray of shape (N, 4) with one (x, y, w, h) per target
+        """
+        return self.multi.update(frame)